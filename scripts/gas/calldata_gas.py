@@ -0,0 +1,165 @@
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.getcwd())
+
+from scripts.utils.make_dirs import make_dirs
+
+# Selectors of `mint(address,Proof,Proof)` and `verify(Proof)`, where `Proof` is
+# `(uint256,uint256,bytes32,bytes32[],bytes32[])`
+MINT_SELECTOR = bytes.fromhex("f891034d")
+VERIFY_SELECTOR = bytes.fromhex("e95778cf")
+
+# Calldata gas costs as defined in EIP-2028
+TX_BASE_GAS = 21000
+ZERO_BYTE_GAS = 4
+NONZERO_BYTE_GAS = 16
+
+WORD_SIZE = 32
+
+
+def encode_uint256(value: int) -> bytes:
+    return value.to_bytes(WORD_SIZE, "big")
+
+
+def encode_bytes32(value: str) -> bytes:
+    data = bytes.fromhex(value.removeprefix("0x"))
+
+    if len(data) > WORD_SIZE:
+        raise ValueError(f"Invalid bytes32 value: {value}")
+
+    return data.ljust(WORD_SIZE, b"\0")
+
+
+def encode_address(value: str) -> bytes:
+    data = bytes.fromhex(value.removeprefix("0x"))
+
+    if len(data) != 20:
+        raise ValueError(f"Invalid address: {value}")
+
+    return data.rjust(WORD_SIZE, b"\0")
+
+
+def encode_bytes32_array(values: list[str]) -> bytes:
+    return encode_uint256(len(values)) + b"".join(encode_bytes32(value) for value in values)
+
+
+def encode_proof(proof: list) -> bytes:
+    token_id, token_num, root, peaks, merkle_proof = proof
+
+    # The offsets of the dynamic arrays are relative to the start of the tuple,
+    # whose head is made of 5 words
+    peaks_offset = 5 * WORD_SIZE
+    merkle_proof_offset = peaks_offset + (len(peaks) + 1) * WORD_SIZE
+
+    return b"".join(
+        [
+            encode_uint256(token_id),
+            encode_uint256(token_num),
+            encode_bytes32(root),
+            encode_uint256(peaks_offset),
+            encode_uint256(merkle_proof_offset),
+            encode_bytes32_array(peaks),
+            encode_bytes32_array(merkle_proof),
+        ]
+    )
+
+
+def encode_mint(to_address: str, prev_token_proof: list, new_token_proof: list) -> bytes:
+    prev_token_data = encode_proof(prev_token_proof)
+    new_token_data = encode_proof(new_token_proof)
+
+    return b"".join(
+        [
+            MINT_SELECTOR,
+            encode_address(to_address),
+            encode_uint256(3 * WORD_SIZE),
+            encode_uint256(3 * WORD_SIZE + len(prev_token_data)),
+            prev_token_data,
+            new_token_data,
+        ]
+    )
+
+
+def encode_verify(proof: list) -> bytes:
+    return VERIFY_SELECTOR + encode_uint256(WORD_SIZE) + encode_proof(proof)
+
+
+ENCODERS = {"mint": encode_mint, "verify": encode_verify}
+
+
+def encode_calldata(inputs_path: str, operation: str) -> tuple[np.ndarray, np.ndarray]:
+    encoder = ENCODERS[operation]
+    calls = []
+
+    with open(inputs_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+
+            if line:
+                # Each line is the comma separated list of the call arguments
+                calls.append(encoder(*json.loads(f"[{line}]")))
+
+    offsets = np.zeros(len(calls) + 1, dtype=np.uint64)
+    offsets[1:] = np.cumsum([len(call) for call in calls])
+    calldata = np.frombuffer(b"".join(calls), dtype=np.uint8)
+
+    return calldata, offsets
+
+
+def derive_calldata_gas(calldata: np.ndarray, offsets: np.ndarray) -> pd.DataFrame:
+    num_bytes = np.diff(offsets).astype(np.int64)
+    # Every call contains at least the selector, hence no segment is empty
+    zero_bytes = np.add.reduceat((calldata == 0).astype(np.int64), offsets[:-1].astype(np.intp))
+    nonzero_bytes = num_bytes - zero_bytes
+    gas_calldata = ZERO_BYTE_GAS * zero_bytes + NONZERO_BYTE_GAS * nonzero_bytes
+
+    calldata_gas = pd.DataFrame(
+        {
+            "num_bytes": num_bytes,
+            "zero_bytes": zero_bytes,
+            "nonzero_bytes": nonzero_bytes,
+            "gas_calldata": gas_calldata,
+            "gas_intrinsic": TX_BASE_GAS + gas_calldata,
+        }
+    )
+    calldata_gas.index += 1
+
+    return calldata_gas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="encode the calldata of mint or verify for each line of an inputs file and compute its intrinsic gas"
+    )
+    parser.add_argument("operation", type=str, choices=ENCODERS.keys(), help="operation the inputs refer to")
+    parser.add_argument(
+        "inputs_path",
+        type=str,
+        help="path to the inputs file generated by gen_mint_inputs or gen_verify_inputs",
+    )
+    parser.add_argument(
+        "out_calldata_path",
+        type=str,
+        help="path to the output NPZ file which will contain the concatenated calldata and the offset of each call",
+    )
+    parser.add_argument(
+        "out_csv_path",
+        type=str,
+        help="path to the output CSV file which will contain the byte counts and the calldata gas of each call",
+    )
+    args = parser.parse_args()
+
+    calldata, offsets = encode_calldata(args.inputs_path, args.operation)
+    calldata_gas = derive_calldata_gas(calldata, offsets)
+
+    make_dirs(args.out_calldata_path)
+    np.savez(args.out_calldata_path, calldata=calldata, offsets=offsets)
+
+    make_dirs(args.out_csv_path)
+    calldata_gas.to_csv(args.out_csv_path, index=True)
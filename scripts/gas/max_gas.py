@@ -1,64 +1,153 @@
 import argparse
-import math
 import os
 import sys
 
+import numpy as np
 import pandas as pd
 
 sys.path.append(os.getcwd())
 
 from scripts.utils.make_dirs import make_dirs
 
+PERCENTILES = [50, 90, 99]
+MAX_NUM_TOKENS = 2**63
 
-def derive_max_gas_mint(gas_mint: pd.DataFrame, num_tokens: int = None) -> pd.Series:
-    max_gas_mint = pd.Series(dtype=pd.Int64Dtype())
-    last = mean = None
 
-    if num_tokens is None:
-        num_tokens = gas_mint.index.max()
+def bit_length(values: np.ndarray) -> np.ndarray:
+    values = values.astype(np.uint64)
+    _, exponents = np.frexp(values.astype(np.float64))
+    lengths = exponents.astype(np.uint64)
+
+    # Values just below 2^k, with k > 53, are rounded up to 2^k when converted to float,
+    # hence their bit length is overestimated by one
+    too_long = (lengths > 0) & ((values >> np.maximum(lengths, 1) - np.uint64(1)) == 0)
+
+    return lengths - too_long.astype(np.uint64)
+
+
+def worst_case_num_tokens(heights: np.ndarray) -> np.ndarray:
+    # The largest collection whose MMR has the given height has 2^height - 1 tokens
+    return np.uint64(2**64 - 1) >> (np.uint64(64) - heights.astype(np.uint64))
 
-    for i in range(1, math.ceil(math.log2(num_tokens)) + 1):
-        if i == 1:
-            last = gas_mint.loc[2**i + 1, "gas_mint"]
-        elif 2**i + 1 <= gas_mint.index.max():
-            last = gas_mint.loc[2**i - 1 : 2**i + 1, "gas_mint"].max()
-        else:
-            if mean is None:
-                mean = int(max_gas_mint.diff().mean())
 
-            last += mean
+def extrapolate(stats: pd.DataFrame, fit: np.ndarray) -> np.ndarray:
+    # Linear extrapolation from the first and last heights in `fit`, which is the mean
+    # increment between consecutive heights; NaN if there are not enough heights to fit
+    heights = stats.index.to_numpy()
+    fit_heights = heights[fit]
 
-        max_gas_mint[2**i + 1] = last
+    if len(fit_heights) < 2:
+        return np.full(stats.shape, np.nan)
 
-    return max_gas_mint
+    first, last = fit_heights[0], fit_heights[-1]
+    slope = (stats.loc[last] - stats.loc[first]).to_numpy() / (last - first)
 
+    return stats.loc[last].to_numpy() + np.outer(heights - last, slope)
 
-def derive_max_gas_verify(ext_max_gas_verify: pd.DataFrame, num_tokens: int) -> pd.Series:
-    max_gas_verify = pd.Series(dtype=pd.Int64Dtype())
-    last = mean = None
 
-    for i in range(1, math.ceil(math.log2(num_tokens)) + 1):
-        if 2**i + 1 <= ext_max_gas_verify.index.max():
-            last = ext_max_gas_verify.loc[2**i - 1 : 2**i + 1, "gas_verify"].max()
-        else:
-            if mean is None:
-                mean = int(max_gas_verify.diff().mean())
+def derive_gas_stats(
+    gas: pd.Series,
+    num_tokens: int,
+    percentiles: list[int] = PERCENTILES,
+    ext_max_gas: pd.Series = None,
+) -> pd.DataFrame:
+    gas = gas.dropna()
+    gas = gas[gas.index > 0]
+    gas_num_tokens = gas.index.to_numpy().astype(np.uint64)
 
-            last += mean
+    grouped = gas.groupby(bit_length(gas_num_tokens))
+    stats = pd.concat(
+        [
+            grouped.max(),
+            grouped.min(),
+            grouped.quantile([p / 100 for p in percentiles], interpolation="lower").unstack(),
+        ],
+        axis=1,
+    )
+    stats.columns = ["max", "min", *[f"p{p}" for p in percentiles]]
+
+    heights = np.arange(1, num_tokens.bit_length() + 1)
+    stats = stats.reindex(heights).astype(np.float64)
+    samples = grouped.size().reindex(heights, fill_value=0).to_numpy().astype(np.uint64)
+
+    # The sparse measurements only contribute to the max, as they are not a sample of
+    # the whole height but mostly its worst case
+    if ext_max_gas is not None:
+        ext_max_gas = ext_max_gas.dropna()
+        ext_max_gas = ext_max_gas[ext_max_gas.index > 0]
+        ext_num_tokens = ext_max_gas.index.to_numpy().astype(np.uint64)
+
+        ext_max = ext_max_gas.groupby(bit_length(ext_num_tokens)).max().reindex(heights)
+        stats["max"] = np.fmax(stats["max"], ext_max)
+        gas_num_tokens = np.union1d(gas_num_tokens, ext_num_tokens)
+
+    # Each height contains the 2^(h - 1) collections from 2^(h - 1) to 2^h - 1 tokens
+    full = samples == np.uint64(1) << (heights.astype(np.uint64) - np.uint64(1))
+    partial = ~full & (samples > 0)
+    status = np.select([full, partial], ["full", "partial"], default="extrapolated")
+
+    # The max of a height is exact only if its worst case, i.e. 2^h - 1 tokens, has been
+    # measured, otherwise it is at least the extrapolated one; the other statistics of
+    # a partial height are the observed ones, while those of a height without any
+    # measurement are extrapolated. The first height is never used for extrapolating,
+    # since the first mint also initializes the storage
+    worst_case_measured = np.isin(worst_case_num_tokens(heights), gas_num_tokens)
+    max_fit = worst_case_measured & (heights > 1)
+    stats.loc[~worst_case_measured, "max"] = np.fmax(
+        stats.loc[~worst_case_measured, "max"], extrapolate(stats[["max"]], max_fit)[~worst_case_measured, 0]
+    )
+
+    others = stats.columns[1:]
+    extrapolated = samples == 0
+    stats.loc[extrapolated, others] = extrapolate(stats[others], full & (heights > 1))[extrapolated]
 
-        max_gas_verify[2**i - 1] = last
+    if stats.isna().any(axis=None):
+        raise ValueError(
+            "At least two MMR heights greater than 1 must be fully measured to extrapolate the heights without measurements"
+        )
 
-    return max_gas_verify
+    stats = stats.round().astype(pd.Int64Dtype())
+    stats["samples"] = samples
+    stats["status"] = status
+
+    return stats
+
+
+def derive_max_gas(
+    gas: pd.DataFrame,
+    ext_max_gas_verify: pd.DataFrame,
+    num_tokens: int = None,
+    percentiles: list[int] = PERCENTILES,
+) -> pd.DataFrame:
+    if num_tokens is None:
+        num_tokens = int(gas.index.max())
+
+    if not 1 <= num_tokens <= MAX_NUM_TOKENS:
+        raise ValueError(f"Invalid number of tokens: {num_tokens}")
+
+    max_gas = pd.concat(
+        [
+            derive_gas_stats(gas["gas_mint"], num_tokens, percentiles).add_suffix("_gas_mint"),
+            derive_gas_stats(
+                gas["gas_verify"], num_tokens, percentiles, ext_max_gas_verify["gas_verify"]
+            ).add_suffix("_gas_verify"),
+        ],
+        axis=1,
+    )
+    max_gas.insert(0, "height", max_gas.index)
+    max_gas.index = worst_case_num_tokens(max_gas.index.to_numpy())
+
+    return max_gas
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
-        description="compute the maximum gas at each MMR height for mint and verify operations"
+        description="compute the maximum, minimum and percentile gas at each MMR height for mint and verify operations"
     )
     parser.add_argument(
-        "gas_mint_csv_path",
+        "gas_csv_path",
         type=str,
-        help="path to the mint gas CSV file",
+        help="path to the merged gas CSV file containing the gas of mint and verify",
     )
     parser.add_argument(
         "ext_max_gas_verify_csv_path",
@@ -68,28 +157,29 @@ if __name__ == "__main__":
     parser.add_argument(
         "max_gas_csv_path",
         type=str,
-        help="path to the output CSV file which will contain the max gas of mint, at several values of 2^n + 1, and verify, at several values of 2^n - 1",
+        help="path to the output CSV file which will contain the gas statistics of mint and verify at each MMR height, indexed by the number of tokens 2^n - 1 of its worst case",
     )
     parser.add_argument(
         "--num_tokens",
         "-n",
         type=int,
-        help="number of tokens in the collection; if not provided, it will be taken as the number of rows in the mint gas CSV file",
+        help=f"number of tokens in the collection, at most {MAX_NUM_TOKENS}; if not provided, it will be taken as the number of rows in the gas CSV file",
         default=None,
     )
+    parser.add_argument(
+        "--percentiles",
+        "-p",
+        type=int,
+        nargs="+",
+        help="percentiles of the gas to compute at each MMR height",
+        default=PERCENTILES,
+    )
     args = parser.parse_args()
 
-    gas_mint = pd.read_csv(args.gas_mint_csv_path, index_col=0)
+    gas = pd.read_csv(args.gas_csv_path, index_col=0)
     ext_max_gas_verify = pd.read_csv(args.ext_max_gas_verify_csv_path, index_col=0)
-    num_tokens = gas_mint.index.max() if args.num_tokens is None else args.num_tokens
-
-    max_gas_mint = derive_max_gas_mint(gas_mint, num_tokens)
-    max_gas_verify = derive_max_gas_verify(ext_max_gas_verify, num_tokens)
-    max_gas = (
-        pd.concat([max_gas_mint, max_gas_verify], axis=1, keys=["max_gas_mint", "max_gas_verify"])
-        .astype(pd.Int64Dtype())
-        .sort_index()
-    )
+
+    max_gas = derive_max_gas(gas, ext_max_gas_verify, args.num_tokens, args.percentiles)
 
     make_dirs(args.max_gas_csv_path)
     max_gas.to_csv(args.max_gas_csv_path, index=True)
@@ -98,30 +98,26 @@ if __name__ == "__main__":
 
     if args.all or args.calculate_gas:
         from scripts.gas.merge_gas import merge_gas_mint_verify
-        from scripts.gas.max_gas import derive_max_gas_mint, derive_max_gas_verify
+        from scripts.gas.max_gas import derive_max_gas
         from scripts.gas.extend_gas import extend_gas
+        from scripts.utils.make_dirs import make_dirs
+        import pandas as pd
 
-        merge_gas_mint_verify(
-            config["data"]["gas"]["raw"]["mint"],
-            config["data"]["gas"]["raw"]["verify"],
-            config["data"]["gas"]["derived"]["merged"],
+        gas = merge_gas_mint_verify(
+            pd.read_csv(config["data"]["gas"]["raw"]["mint"]),
+            pd.read_csv(config["data"]["gas"]["raw"]["verify"]),
         )
+        make_dirs(config["data"]["gas"]["derived"]["merged"])
+        gas.to_csv(config["data"]["gas"]["derived"]["merged"], index=True)
 
-        num_tokens = derive_max_gas_mint(
-            config["data"]["gas"]["derived"]["merged"],
-            config["data"]["gas"]["derived"]["max_mint"],
-        )
-        derive_max_gas_verify(
-            config["data"]["gas"]["raw"]["max_verify"],
-            config["data"]["gas"]["derived"]["max_verify"],
-            num_tokens=num_tokens,
-        )
+        max_gas = derive_max_gas(gas, pd.read_csv(config["data"]["gas"]["raw"]["max_verify"], index_col=0))
+        make_dirs(config["data"]["gas"]["derived"]["max"])
+        max_gas.to_csv(config["data"]["gas"]["derived"]["max"], index=True)
 
-        extend_gas(
-            config["data"]["gas"]["derived"]["merged"],
-            config["data"]["gas"]["derived"]["max_verify"],
-            config["data"]["gas"]["derived"]["complete"],
-        )
+        extended_gas = gas.astype(pd.Int64Dtype())
+        extend_gas(extended_gas, max_gas)
+        make_dirs(config["data"]["gas"]["derived"]["complete"])
+        extended_gas.to_csv(config["data"]["gas"]["derived"]["complete"], index=True)
 
     if args.all or args.calculate_collection_gas:
         from scripts.collection.collection_gas import derive_collection_gas, timedelta_type
@@ -1,11 +1,12 @@
 use crate::{
-    hash::{Hash, Hashable},
+    hash::{BatchHasher, Hash, Hashable, Keccak256Hasher},
     proof::Proof,
     types::U256,
     utils::*,
 };
 
 use core::fmt::Debug;
+use num::traits::ToBytes;
 
 #[derive(Debug)]
 pub struct MMR {
@@ -19,6 +20,72 @@ impl MMR {
         mmr
     }
 
+    /// Builds the MMR containing `items` in one go, producing the same MMR
+    /// as appending them one at a time.
+    pub fn from_items(items: &[U256]) -> Self {
+        Self::from_items_with(items, &Keccak256Hasher)
+    }
+
+    /// Same as `from_items`, but hashes the nodes with the given `hasher`.
+    ///
+    /// The leaves are hashed in a single batch, then the MMR is built level by
+    /// level: the level at height `h` holds the `leaf_count >> h` nodes of all the
+    /// complete subtrees, and its `j`-th node is the parent of the nodes `2j` and
+    /// `2j + 1` of the level below. Finally, every node is moved to its position
+    /// in the MMR, which only depends on its height and on its last leaf.
+    pub fn from_items_with<H: BatchHasher>(items: &[U256], hasher: &H) -> Self {
+        assert!(!items.is_empty());
+
+        let mut inputs = items
+            .iter()
+            .enumerate()
+            .map(|(leaf_index, item)| {
+                let mut input = [0; 64];
+                input[..32].copy_from_slice(&item.to_be_bytes());
+                input[32..].copy_from_slice(&U256::from(leaf_index as u64 + 1).to_be_bytes());
+                input
+            })
+            .collect::<Vec<[u8; 64]>>();
+
+        let mut leaves = vec![Hash::default(); items.len()];
+        hasher.hash_batch(&inputs, &mut leaves);
+
+        let mut levels = vec![leaves];
+
+        while levels.last().unwrap().len() > 1 {
+            let children = levels.last().unwrap();
+
+            inputs.clear();
+            inputs.extend(children.chunks_exact(2).map(|pair| {
+                let mut input = [0; 64];
+                input[..32].copy_from_slice(pair[0].as_ref());
+                input[32..].copy_from_slice(pair[1].as_ref());
+                input
+            }));
+
+            let mut parents = vec![Hash::default(); inputs.len()];
+            hasher.hash_batch(&inputs, &mut parents);
+            levels.push(parents);
+        }
+
+        let leaf_count = items.len() as u64;
+        let mut data = vec![(Hash::default(), None); leaf_count_to_mmr_size(leaf_count) as usize];
+
+        for (height, level) in levels.iter().enumerate() {
+            for (node_num, node) in level.iter().enumerate() {
+                let mmr_index = node_index(height as u64, (node_num as u64 + 1) << height);
+                let item = if height == 0 {
+                    Some(items[node_num])
+                } else {
+                    None
+                };
+                data[mmr_index as usize] = (*node, item);
+            }
+        }
+
+        MMR { data }
+    }
+
     pub fn size(&self) -> u64 {
         self.data.len() as u64
     }
@@ -116,6 +183,42 @@ mod tests {
     use super::*;
     use std::time::Instant;
 
+    #[test]
+    fn test_from_items() {
+        for leaf_count in 1..=100u64 {
+            let items = (1..=leaf_count).map(U256::from).collect::<Vec<U256>>();
+
+            let mut mmr = MMR::new(items[0]);
+            for item in &items[1..] {
+                mmr.append(*item);
+            }
+
+            let bulk_mmr = MMR::from_items(&items);
+
+            assert_eq!(bulk_mmr.data, mmr.data);
+            assert_eq!(bulk_mmr.root(), mmr.root());
+        }
+    }
+
+    #[test]
+    fn benchmark_from_items() {
+        let items = (0..170_000u64).map(U256::from).collect::<Vec<U256>>();
+
+        let now = Instant::now();
+        let mut mmr = MMR::new(items[0]);
+        for item in &items[1..] {
+            mmr.append(*item);
+        }
+        println!("MMR generation time: {}ms", now.elapsed().as_millis());
+
+        let now = Instant::now();
+        let bulk_mmr = MMR::from_items(&items);
+        println!("Bulk MMR generation time: {}ms", now.elapsed().as_millis());
+
+        // Large enough for the batches of the lowest levels to be hashed in parallel
+        assert_eq!(bulk_mmr.data, mmr.data);
+    }
+
     #[test]
     fn benchmark_mmr() {
         let items = 170_000;
@@ -1,6 +1,10 @@
 use num::traits::ToBytes;
 use sha3::{Digest, Keccak256};
-use std::fmt::{Debug, Display, Formatter, Result};
+use std::{
+    fmt::{Debug, Display, Formatter, Result},
+    num::NonZeroUsize,
+    thread,
+};
 
 #[derive(Clone, Copy, Debug, PartialEq, Eq, Default)]
 pub struct Hash {
@@ -12,6 +16,58 @@ pub trait Hashable: ToBytes {
     fn hash_with(&self, other: Self) -> Hash;
 }
 
+/// Backend hashing many 64-byte buffers at once, used when building an MMR in bulk.
+/// Implementations must compute the Keccak-256 digest of each input, so that the
+/// result matches `Hashable::hash_with`; faster implementations can be plugged in
+/// through `MMR::from_items_with`.
+pub trait BatchHasher {
+    /// Writes the digest of `inputs[i]` into `outputs[i]`.
+    fn hash_batch(&self, inputs: &[[u8; 64]], outputs: &mut [Hash]);
+}
+
+/// Default `BatchHasher` backed by the `sha3` crate. The inputs of a batch are
+/// independent, so large batches are split across the available cores.
+#[derive(Clone, Copy, Debug, Default)]
+pub struct Keccak256Hasher;
+
+impl Keccak256Hasher {
+    /// Minimum number of inputs for which a batch is hashed in parallel, since
+    /// smaller batches do not pay off the cost of spawning the threads.
+    const PARALLEL_BATCH_SIZE: usize = 4096;
+
+    fn hash_chunk(inputs: &[[u8; 64]], outputs: &mut [Hash]) {
+        let mut hasher = Keccak256::new();
+
+        for (input, output) in inputs.iter().zip(outputs.iter_mut()) {
+            hasher.update(input);
+            *output = Hash::from(hasher.finalize_reset().as_slice());
+        }
+    }
+}
+
+impl BatchHasher for Keccak256Hasher {
+    fn hash_batch(&self, inputs: &[[u8; 64]], outputs: &mut [Hash]) {
+        assert_eq!(inputs.len(), outputs.len());
+
+        let threads = thread::available_parallelism().map_or(1, NonZeroUsize::get);
+
+        if threads == 1 || inputs.len() < Self::PARALLEL_BATCH_SIZE {
+            return Self::hash_chunk(inputs, outputs);
+        }
+
+        let chunk_size = inputs.len().div_ceil(threads);
+
+        thread::scope(|scope| {
+            for (inputs, outputs) in inputs
+                .chunks(chunk_size)
+                .zip(outputs.chunks_mut(chunk_size))
+            {
+                scope.spawn(move || Self::hash_chunk(inputs, outputs));
+            }
+        });
+    }
+}
+
 impl Hash {
     pub fn new(data: [u8; 32]) -> Self {
         Hash { data }
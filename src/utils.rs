@@ -48,6 +48,18 @@ pub fn leaf_count_to_mmr_size(leaf_count: u64) -> u64 {
     2 * leaf_count - leaf_count.count_ones() as u64
 }
 
+/// Returns the MMR index of the node at `height` whose subtree ends with the
+/// `leaf_count`-th leaf. `leaf_count` must be a multiple of `2^height`.
+///
+/// # Example
+///
+/// The node at height `1` covering the leaves `3` and `4` has index `5`,
+/// as it is the second node created when appending the fourth leaf, which
+/// creates the nodes `4`, `5` and `6`.
+pub fn node_index(height: u64, leaf_count: u64) -> u64 {
+    leaf_count_to_mmr_size(leaf_count) - 1 - (least_significant_bit(leaf_count) - height)
+}
+
 /// Returns the number of leaves in an MMR of size `mmr_size`.
 pub fn mmr_size_to_leaf_count(mut mmr_size: u64) -> Option<u64> {
     let mut leaf_count = 0;
@@ -210,6 +222,18 @@ pub mod tests {
         assert_eq!(mmr_index_to_leaf_index(22), Some(12));
     }
 
+    #[test]
+    fn test_node_index() {
+        assert_eq!(node_index(0, 1), 0);
+        assert_eq!(node_index(0, 2), 1);
+        assert_eq!(node_index(1, 2), 2);
+        assert_eq!(node_index(0, 4), 4);
+        assert_eq!(node_index(1, 4), 5);
+        assert_eq!(node_index(2, 4), 6);
+        assert_eq!(node_index(0, 7), 10);
+        assert_eq!(node_index(0, 8), 11);
+    }
+
     #[test]
     fn test_height() {
         assert_eq!(height(0), 0);